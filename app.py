@@ -1,339 +1,633 @@
-import os
-import json
-import random
-import urllib.parse
-import urllib.request
-from pathlib import Path
-from flask import Flask, jsonify, render_template, request, session
-
-app = Flask(__name__)
-app.secret_key = os.environ.get("FLASK_SECRET_KEY", "dev-secret-change-me")
-
-START_LIFE = 8
-HINT_LETTER_MAX = 2
-HINT_LETTER_COST = 2
-
-# ----------------- load words -----------------
-WORDS_FILE = Path("animals.txt")
-if not WORDS_FILE.exists():
-    raise FileNotFoundError("animals.txt not found next to app.py")
-
-ANIMALS = []
-for line in WORDS_FILE.read_text(encoding="utf-8", errors="ignore").splitlines():
-    w = line.strip().lower()
-    if w and w.isalpha():
-        ANIMALS.append(w)
-
-if not ANIMALS:
-    raise ValueError("animals.txt is empty or has no valid a-z words.")
-
-# ----------------- translate (prefer `translate` lib, else fallback) -----------------
-TRANSLATE_CACHE: dict[str, str] = {}
-
-try:
-    from translate import Translator  # type: ignore
-    HAS_TRANSLATE_LIB = True
-except Exception:
-    HAS_TRANSLATE_LIB = False
-
-def translate_to_th(text: str) -> str:
-    text = (text or "").strip()
-    if not text:
-        return ""
-
-    key = text.lower()
-    if key in TRANSLATE_CACHE:
-        return TRANSLATE_CACHE[key]
-
-    # A) translate lib
-    if HAS_TRANSLATE_LIB:
-        try:
-            tr = Translator(from_lang="en", to_lang="th")
-            th = (tr.translate(text) or "").strip()
-            if th:
-                TRANSLATE_CACHE[key] = th
-            return th
-        except Exception:
-            pass
-
-    # B) fallback: MyMemory (no pip)
-    try:
-        q = urllib.parse.quote(text)
-        url = f"https://api.mymemory.translated.net/get?q={q}&langpair=en|th"
-        req = urllib.request.Request(url, headers={"User-Agent": "AnimalHangman/1.0"})
-        with urllib.request.urlopen(req, timeout=7) as resp:
-            data = json.loads(resp.read().decode("utf-8", errors="ignore"))
-        th = ((data.get("responseData") or {}).get("translatedText") or "").strip()
-        if th:
-            TRANSLATE_CACHE[key] = th
-        return th
-    except Exception:
-        return ""
-
-# ----------------- wikipedia summary (image + short explanation) -----------------
-WIKI_CACHE: dict[str, dict] = {}
-
-def wikipedia_summary(word: str) -> dict:
-    """
-    Returns: { img, desc_en, extract_en }
-    desc_en = short description line
-    extract_en = short paragraph
-    """
-    word = (word or "").strip()
-    if not word:
-        return {"img": "", "desc_en": "", "extract_en": ""}
-
-    key = word.lower()
-    if key in WIKI_CACHE:
-        return WIKI_CACHE[key]
-
-    title = urllib.parse.quote(word)
-    url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{title}"
-    req = urllib.request.Request(url, headers={"User-Agent": "AnimalHangman/1.0"})
-
-    try:
-        with urllib.request.urlopen(req, timeout=8) as resp:
-            data = json.loads(resp.read().decode("utf-8", errors="ignore"))
-
-        img = ((data.get("thumbnail") or {}).get("source") or "").strip()
-        desc_en = (data.get("description") or "").strip()
-        extract_en = (data.get("extract") or "").strip()
-
-        out = {"img": img, "desc_en": desc_en, "extract_en": extract_en}
-        WIKI_CACHE[key] = out
-        return out
-    except Exception:
-        out = {"img": "", "desc_en": "", "extract_en": ""}
-        WIKI_CACHE[key] = out
-        return out
-
-# ----------------- game state helpers -----------------
-def mask_word(word: str, guessed: set[str]) -> str:
-    return " ".join(c if c in guessed else "_" for c in word)
-
-def pick_word() -> str:
-    return random.choice(ANIMALS)
-
-def start_round(stage: int, life: int) -> dict:
-    word = pick_word()
-    info = wikipedia_summary(word)
-
-    return {
-        "stage": stage,
-        "life": life,
-        "word": word,                 # backend only
-        "img": info["img"],
-        "desc_en": info["desc_en"],
-        "extract_en": info["extract_en"],
-
-        "guessed": [],
-        "wrong": [],
-        "hint_letters_used": 0,
-
-        "status": "playing",          # playing | failed
-        "message": f"🧩 STAGE {stage} started",
-
-        # last revealed (after clear/fail)
-        "last_en": "",
-        "last_th": "",
-        "last_about_en": "",
-        "last_about_th": "",
-    }
-
-def public_state(st: dict) -> dict:
-    guessed = set(st.get("guessed", []))
-    word = st.get("word", "")
-    masked = mask_word(word, guessed) if word else ""
-    return {
-        "stage": st.get("stage", 1),
-        "life": st.get("life", START_LIFE),
-        "length": len(word),
-        "masked": masked,
-        "wrong": st.get("wrong", []),
-        "status": st.get("status", "playing"),
-        "message": st.get("message", ""),
-
-        # show immediately
-        "img": st.get("img", ""),
-        "hint_letters_used": st.get("hint_letters_used", 0),
-        "hint_letters_max": HINT_LETTER_MAX,
-
-        # last revealed (only changes after clear/fail)
-        "last_en": st.get("last_en", ""),
-        "last_th": st.get("last_th", ""),
-        "last_about_en": st.get("last_about_en", ""),
-        "last_about_th": st.get("last_about_th", ""),
-    }
-
-def get_state():
-    return session.get("game")
-
-def save_state(st):
-    session["game"] = st
-
-# ----------------- routes -----------------
-@app.get("/")
-def index():
-    return render_template("index.html")
-
-@app.get("/api/state")
-def api_state():
-    st = get_state()
-    if not st:
-        return jsonify({"status": "no_game"})
-    return jsonify(public_state(st))
-
-@app.post("/api/reset")
-def api_reset():
-    session.pop("game", None)
-    return jsonify({"ok": True})
-
-@app.post("/api/start")
-def api_start():
-    st = start_round(stage=1, life=START_LIFE)
-    save_state(st)
-    return jsonify(public_state(st))
-
-@app.post("/api/guess")
-def api_guess():
-    st = get_state()
-    if not st:
-        return jsonify({"error": "no_game"}), 400
-    if st["status"] != "playing":
-        return jsonify(public_state(st))
-
-    data = request.get_json(silent=True) or {}
-    g = (data.get("guess") or "").lower().strip()
-
-    if len(g) != 1 or not g.isalpha():
-        st["message"] = "Enter ONE letter only (a-z)"
-        save_state(st)
-        return jsonify(public_state(st))
-
-    guessed = set(st["guessed"])
-    wrong = set(st["wrong"])
-    word = st["word"]
-    life = int(st["life"])
-
-    if g in guessed or g in wrong:
-        st["message"] = f"Already guessed: {g}"
-        save_state(st)
-        return jsonify(public_state(st))
-
-    if g in word:
-        guessed.add(g)
-        life += 2
-        st["message"] = f"✅ Correct! +2 life -> {life}"
-    else:
-        wrong.add(g)
-        life -= 1
-        st["message"] = f"❌ Wrong! -1 life -> {life}"
-
-    st["guessed"] = sorted(list(guessed))
-    st["wrong"] = sorted(list(wrong))
-    st["life"] = life
-
-    # fail
-    if life <= 0:
-        about_en = (st.get("desc_en") or st.get("extract_en") or "").strip()
-        st["status"] = "failed"
-        st["last_en"] = word
-        st["last_th"] = translate_to_th(word) or "-"
-        st["last_about_en"] = about_en or "-"
-        st["last_about_th"] = translate_to_th(about_en) if about_en else "-"
-        st["message"] = f"💀 GAME OVER! Word: {st['last_en']} | ไทย: {st['last_th']}"
-        save_state(st)
-        return jsonify(public_state(st))
-
-    # clear -> next round immediately
-    if all(c in guessed for c in word):
-        about_en = (st.get("desc_en") or st.get("extract_en") or "").strip()
-
-        st["last_en"] = word
-        st["last_th"] = translate_to_th(word) or "-"
-        st["last_about_en"] = about_en or "-"
-        st["last_about_th"] = translate_to_th(about_en) if about_en else "-"
-
-        next_stage = int(st["stage"]) + 1
-        next_life = life  # carry life
-        nxt = start_round(stage=next_stage, life=next_life)
-
-        # carry last reveal info into new round
-        nxt["last_en"] = st["last_en"]
-        nxt["last_th"] = st["last_th"]
-        nxt["last_about_en"] = st["last_about_en"]
-        nxt["last_about_th"] = st["last_about_th"]
-        nxt["message"] = f"🎉 CLEAR! {nxt['last_en']} | ไทย: {nxt['last_th']} → Next word!"
-
-        st = nxt
-
-    save_state(st)
-    return jsonify(public_state(st))
-
-@app.post("/api/hint_letter")
-def api_hint_letter():
-    st = get_state()
-    if not st:
-        return jsonify({"error": "no_game"}), 400
-    if st["status"] != "playing":
-        return jsonify(public_state(st))
-
-    used = int(st.get("hint_letters_used", 0))
-    if used >= HINT_LETTER_MAX:
-        st["message"] = "Hint letter limit reached (2 per word)."
-        save_state(st)
-        return jsonify(public_state(st))
-
-    word = st["word"]
-    guessed = set(st["guessed"])
-    remaining = sorted({c for c in word if c.isalpha() and c not in guessed})
-
-    if not remaining:
-        st["message"] = "No letters left to reveal."
-        save_state(st)
-        return jsonify(public_state(st))
-
-    reveal = random.choice(remaining)
-    guessed.add(reveal)
-    st["guessed"] = sorted(list(guessed))
-
-    st["hint_letters_used"] = used + 1
-    st["life"] = int(st["life"]) - HINT_LETTER_COST
-    st["message"] = f"💡 Hint: '{reveal}' (-{HINT_LETTER_COST} life) | {st['hint_letters_used']}/{HINT_LETTER_MAX}"
-
-    # fail after hint
-    if st["life"] <= 0:
-        about_en = (st.get("desc_en") or st.get("extract_en") or "").strip()
-        st["status"] = "failed"
-        st["last_en"] = word
-        st["last_th"] = translate_to_th(word) or "-"
-        st["last_about_en"] = about_en or "-"
-        st["last_about_th"] = translate_to_th(about_en) if about_en else "-"
-        st["message"] = f"💀 GAME OVER! Word: {st['last_en']} | ไทย: {st['last_th']}"
-        save_state(st)
-        return jsonify(public_state(st))
-
-    # clear after hint -> next round
-    if all(c in guessed for c in word):
-        about_en = (st.get("desc_en") or st.get("extract_en") or "").strip()
-        st["last_en"] = word
-        st["last_th"] = translate_to_th(word) or "-"
-        st["last_about_en"] = about_en or "-"
-        st["last_about_th"] = translate_to_th(about_en) if about_en else "-"
-
-        next_stage = int(st["stage"]) + 1
-        nxt = start_round(stage=next_stage, life=int(st["life"]))
-
-        nxt["last_en"] = st["last_en"]
-        nxt["last_th"] = st["last_th"]
-        nxt["last_about_en"] = st["last_about_en"]
-        nxt["last_about_th"] = st["last_about_th"]
-        nxt["message"] = f"🎉 CLEAR! {nxt['last_en']} | ไทย: {nxt['last_th']} → Next word!"
-
-        st = nxt
-
-    save_state(st)
-    return jsonify(public_state(st))
-
-if __name__ == "__main__":
-    app.run(debug=True)
+import asyncio
+import collections
+import mmap
+import os
+import random
+import re
+import threading
+import time
+import urllib.parse
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import flask
+import httpx
+import orjson
+import redis
+from flask import Flask, jsonify, render_template, request, session
+from flask.json.provider import JSONProvider
+from flask_caching import Cache
+from flask_session import Session
+
+class OrjsonProvider(JSONProvider):
+    """JSON via orjson (C extension, ~3-5x faster than stdlib json)."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app = Flask(__name__)
+app.json = OrjsonProvider(app)
+app.secret_key = os.environ.get("FLASK_SECRET_KEY", "dev-secret-change-me")
+
+# Server-side sessions: the cookie carries only a session id and the game
+# dict (incl. the multi-KB extract_en text) lives in Redis, instead of being
+# pickled + HMAC-signed into Set-Cookie on every response.
+# SESSION_TYPE=cookie falls back to Flask's signed cookie for local dev.
+if os.environ.get("SESSION_TYPE", "redis") == "redis":
+    app.config.update(
+        SESSION_TYPE="redis",
+        SESSION_REDIS=redis.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379/0")),
+        SESSION_PERMANENT=False,
+    )
+    Session(app)
+
+# Shared cache (Redis) so lookups survive restarts and are shared across workers.
+# CACHE_TYPE can be overridden (e.g. SimpleCache) for local dev without Redis.
+cache = Cache(app, config={
+    "CACHE_TYPE": os.environ.get("CACHE_TYPE", "RedisCache"),
+    "CACHE_REDIS_URL": os.environ.get("REDIS_URL", "redis://localhost:6379/0"),
+    "CACHE_DEFAULT_TIMEOUT": 60 * 60 * 24 * 7,  # these lookups are effectively static
+})
+
+# One pooled client for all outbound calls: keep-alive + HTTP/2 instead of a
+# fresh TCP/TLS handshake per lookup. httpx.Client is thread-safe, so it can
+# be shared by request handlers and background threads alike.
+CLIENT = httpx.Client(
+    http2=True,
+    # Tight per-phase bounds: a slow upstream must not pin a worker for
+    # seconds — tail latency here is what users feel, not the median.
+    timeout=httpx.Timeout(connect=0.5, read=2.0, write=1.0, pool=0.5),
+    # Two upstream hosts, many concurrent users: keep enough warm
+    # connections around that repeat hits skip the TCP+TLS handshake.
+    limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+    headers={"User-Agent": "AnimalHangman/1.0"},
+)
+
+# Per-host circuit breaker: after BREAKER_FAIL_MAX failures within
+# BREAKER_WINDOW seconds, short-circuit that host for BREAKER_WINDOW so an
+# unhealthy upstream fails fast instead of eating a timeout per request.
+BREAKER_FAIL_MAX = 5
+BREAKER_WINDOW = 30.0
+
+_BREAKER_LOCK = threading.Lock()
+_FAIL_COUNT: dict[str, int] = {}
+_FAIL_SINCE: dict[str, float] = {}
+_OPEN_UNTIL: dict[str, float] = {}
+
+def _record_failure(host: str) -> None:
+    now = time.monotonic()
+    with _BREAKER_LOCK:
+        if now - _FAIL_SINCE.get(host, 0.0) > BREAKER_WINDOW:
+            _FAIL_SINCE[host] = now
+            _FAIL_COUNT[host] = 0
+        _FAIL_COUNT[host] = _FAIL_COUNT.get(host, 0) + 1
+        if _FAIL_COUNT[host] > BREAKER_FAIL_MAX:
+            _OPEN_UNTIL[host] = now + BREAKER_WINDOW
+            _FAIL_COUNT[host] = 0
+
+def fetch_json(url: str) -> dict:
+    """GET url as JSON with one backoff-retry and the circuit breaker.
+
+    Raises on failure so callers keep their existing except-paths.
+    """
+    host = urllib.parse.urlsplit(url).hostname or ""
+    with _BREAKER_LOCK:
+        if time.monotonic() < _OPEN_UNTIL.get(host, 0.0):
+            raise ConnectionError(f"circuit open for {host}")
+
+    last_exc: Exception = ConnectionError(url)
+    for attempt in range(2):
+        try:
+            resp = CLIENT.get(url)
+            if 400 <= resp.status_code < 500:
+                # A 4xx (e.g. Wikipedia 404 for an unknown title) is a
+                # healthy upstream answering "no": not worth a retry and
+                # not a breaker failure — callers negative-cache it.
+                raise LookupError(f"{resp.status_code} for {url}")
+            resp.raise_for_status()
+            data = orjson.loads(resp.content)  # bytes in, no decode step
+        except LookupError:
+            raise
+        except Exception as exc:
+            last_exc = exc
+            _record_failure(host)
+            if attempt == 0:
+                time.sleep(0.1 * 2 ** attempt + random.random() * 0.05)
+            continue
+        with _BREAKER_LOCK:
+            _FAIL_COUNT[host] = 0
+        return data
+    raise last_exc
+
+# Background workers for cache warming; results land in the shared cache.
+EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+START_LIFE = 8
+HINT_LETTER_MAX = 2
+HINT_LETTER_COST = 2
+
+# ----------------- load words -----------------
+WORDS_FILE = Path("animals.txt")
+if not WORDS_FILE.exists():
+    raise FileNotFoundError("animals.txt not found next to app.py")
+
+# One C-level regex scan over the mmapped file instead of a per-line Python
+# strip/lower/isalpha loop. ^...$ keeps the old semantics (all-letter lines
+# only), and dict.fromkeys dedupes while preserving file order so duplicate
+# entries don't bias random.choice.
+_WORD_RE = re.compile(rb"^[A-Za-z]+$", re.M)
+with open(WORDS_FILE, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+    ANIMALS = list(dict.fromkeys(m.decode("ascii").lower() for m in _WORD_RE.findall(mm)))
+
+if not ANIMALS:
+    raise ValueError("animals.txt is empty or has no valid a-z words.")
+
+# Per-word letter bitmasks, built once (bit 0 = 'a' ... bit 25 = 'z'):
+# clear checks and remaining-letter math become single int ops instead of
+# per-character Python loops, and the session stores two small ints
+# instead of two sorted lists.
+WORD_MASK = {w: sum(1 << (ord(c) - 97) for c in frozenset(w)) for w in ANIMALS}
+
+# Letter frequencies over the wordlist, used to weight hint reveals: a
+# common letter is worth more than a rare one (it rules out more wrong
+# guesses), so hints bias toward high-information reveals.
+LETTER_FREQ = collections.Counter("".join(ANIMALS))
+
+# Pre-resolved lookups generated by build_preload.py at deploy time. For
+# every word in the list the hot path becomes a dict hit with zero outbound
+# HTTP; empty wiki entries double as a persistent known-404 set so titles
+# Wikipedia doesn't have are never re-fetched.
+def _load_preload(name: str) -> dict:
+    p = Path(name)
+    return orjson.loads(p.read_bytes()) if p.exists() else {}
+
+WIKI_PRELOAD = _load_preload("animals_wiki.json")
+TH_PRELOAD = _load_preload("animals_th.json")
+
+# Ring buffer of upcoming words: start_round does an O(1) pop and the
+# prefetcher can warm caches for words the player hasn't seen yet.
+NEXT_WORDS = collections.deque(random.sample(ANIMALS, k=min(32, len(ANIMALS))))
+NEXT_WORDS_LOW = 8
+_NEXT_WORDS_LOCK = threading.Lock()
+
+def _refill_next_words() -> None:
+    batch = random.sample(ANIMALS, k=min(32, len(ANIMALS)))
+    with _NEXT_WORDS_LOCK:
+        NEXT_WORDS.extend(batch)
+
+def letter_bit(c: str) -> int:
+    return 1 << (ord(c) - 97)
+
+def mask_letters(mask: int) -> list[str]:
+    return [chr(97 + i) for i in range(26) if mask >> i & 1]
+
+# ----------------- translate (prefer `translate` lib, else fallback) -----------------
+try:
+    from translate import Translator  # type: ignore
+    HAS_TRANSLATE_LIB = True
+except Exception:
+    HAS_TRANSLATE_LIB = False
+
+# Good answers are effectively static; failures are cached too (briefly) so
+# a wobbly upstream doesn't get re-hit by every game end, but the empty
+# answer can't stick around for a week.
+POSITIVE_TTL = 604800
+NEGATIVE_TTL = 120
+
+def translate_to_th(text: str) -> str:
+    # Normalize here so the cache key is the same for "Lion"/"lion "/etc.
+    text = (text or "").strip()
+    if not text:
+        return ""
+    norm = text.lower()
+    th = TH_PRELOAD.get(norm)
+    if th:
+        return th
+    key = "th:" + norm
+    th = cache.get(key)
+    if th is None:
+        th = _fetch_translation(norm)
+        cache.set(key, th, timeout=POSITIVE_TTL if th else NEGATIVE_TTL)
+    return th
+
+def _fetch_translation(text: str) -> str:
+    # A) translate lib
+    if HAS_TRANSLATE_LIB:
+        try:
+            tr = Translator(from_lang="en", to_lang="th")
+            th = (tr.translate(text) or "").strip()
+            if th:
+                return th
+        except Exception:
+            pass
+
+    # B) fallback: MyMemory (no pip)
+    try:
+        q = urllib.parse.quote(text)
+        url = f"https://api.mymemory.translated.net/get?q={q}&langpair=en|th"
+        data = fetch_json(url)
+        return ((data.get("responseData") or {}).get("translatedText") or "").strip()
+    except Exception:
+        return ""
+
+# ----------------- wikipedia summary (image + short explanation) -----------------
+def wikipedia_summary(word: str) -> dict:
+    """
+    Returns: { img, desc_en, extract_en }
+    desc_en = short description line
+    extract_en = short paragraph
+    """
+    word = (word or "").strip()
+    if not word:
+        return {"img": "", "desc_en": "", "extract_en": ""}
+    norm = word.lower()
+    # Preloaded entries are authoritative — including empty ones (known 404s).
+    out = WIKI_PRELOAD.get(norm)
+    if out is not None:
+        return out
+    key = "wiki:" + norm
+    out = cache.get(key)
+    if out is None:
+        out = _fetch_wiki_summary(norm)
+        cache.set(key, out, timeout=POSITIVE_TTL if any(out.values()) else NEGATIVE_TTL)
+    return out
+
+def _wiki_cached(word: str) -> dict | None:
+    """Non-blocking probe: preloaded or already-cached summary, else None."""
+    info = WIKI_PRELOAD.get(word)
+    if info is None:
+        info = cache.get("wiki:" + word)
+    return info
+
+def _fetch_wiki_summary(word: str) -> dict:
+    try:
+        return _wiki_summary_from_api(word)
+    except Exception:
+        return {"img": "", "desc_en": "", "extract_en": ""}
+
+def _wiki_summary_from_api(word: str) -> dict:
+    """Fetch and parse one summary; raises on failure.
+
+    build_preload.py calls this directly so it can tell a genuine 404
+    (LookupError — a permanent known miss) from a transient failure that
+    must not be frozen into the preload files.
+    """
+    title = urllib.parse.quote(word)
+    data = fetch_json(f"https://en.wikipedia.org/api/rest_v1/page/summary/{title}")
+
+    img = ((data.get("thumbnail") or {}).get("source") or "").strip()
+    desc_en = (data.get("description") or "").strip()
+    extract_en = (data.get("extract") or "").strip()
+
+    return {"img": img, "desc_en": desc_en, "extract_en": extract_en}
+
+# ----------------- game state helpers -----------------
+def mask_word(word: str, g_mask: int) -> str:
+    return " ".join(c if g_mask & letter_bit(c) else "_" for c in word)
+
+def pick_word() -> str:
+    with _NEXT_WORDS_LOCK:
+        word = NEXT_WORDS.popleft() if NEXT_WORDS else random.choice(ANIMALS)
+        low = len(NEXT_WORDS) < NEXT_WORDS_LOW
+    if low:
+        EXECUTOR.submit(_refill_next_words)
+    return word
+
+def _warm_reveal(word: str) -> None:
+    """Warm the exact lookups the clear/fail reveal will make: the summary,
+    then the batched word+about translation keyed on the combined text."""
+    info = wikipedia_summary(word)
+    about_en = (info.get("desc_en") or info.get("extract_en") or "").strip()
+    if about_en:
+        translate_to_th(word + _PAIR_SEP + about_en)
+    else:
+        translate_to_th(word)
+
+def start_round(stage: int, life: int) -> dict:
+    word = pick_word()
+
+    # Don't block the response on Wikipedia. Use the summary only if it is
+    # already cached (the prefetcher usually got there first); otherwise
+    # return the scaffold with blank wiki fields, fetch in the background
+    # (via _warm_reveal below), and backfill via _backfill_wiki.
+    info = _wiki_cached(word)
+    wiki_pending = info is None
+    if wiki_pending:
+        info = {"img": "", "desc_en": "", "extract_en": ""}
+
+    # Warm caches while the player is still guessing: summaries for the
+    # actual upcoming words, and this word's reveal lookups. Fire-and-forget
+    # — by the time they're needed the lookups are almost always cache hits
+    # instead of blocking HTTP calls.
+    with _NEXT_WORDS_LOCK:
+        upcoming = list(NEXT_WORDS)[:2]
+    for w in upcoming:
+        EXECUTOR.submit(wikipedia_summary, w)
+    EXECUTOR.submit(_warm_reveal, word)
+
+    return {
+        "stage": stage,
+        "life": life,
+        "word": word,                 # backend only
+        "img": info["img"],
+        "desc_en": info["desc_en"],
+        "extract_en": info["extract_en"],
+
+        "g": 0,                       # guessed letters bitmask
+        "w": 0,                       # wrong letters bitmask
+        "hint_letters_used": 0,
+        "wiki_pending": wiki_pending,
+
+        "status": "playing",          # playing | failed
+        "message": f"🧩 STAGE {stage} started",
+
+        # last revealed (after clear/fail)
+        "last_en": "",
+        "last_th": "",
+        "last_about_en": "",
+        "last_about_th": "",
+    }
+
+def _backfill_wiki(st: dict) -> None:
+    """Copy a background-fetched summary into the state once it's cached."""
+    info = _wiki_cached(st.get("word", ""))
+    if info is not None:
+        st["img"] = info["img"]
+        st["desc_en"] = info["desc_en"]
+        st["extract_en"] = info["extract_en"]
+        st["wiki_pending"] = False
+
+# Separator for batching two texts into one translate call. MT engines
+# pass it through verbatim often enough that the split usually works.
+_PAIR_SEP = "\n|||\n"
+
+async def _translate_pair(word: str, about_en: str) -> tuple[str, str]:
+    """Translate the word and the about text in one upstream call.
+
+    Falls back to two concurrent single calls if the separator got
+    mangled in translation.
+    """
+    if not about_en:
+        return await asyncio.to_thread(translate_to_th, word), ""
+    combined = await asyncio.to_thread(translate_to_th, word + _PAIR_SEP + about_en)
+    parts = combined.split("|||")
+    if len(parts) == 2 and parts[0].strip():
+        return parts[0].strip(), parts[1].strip()
+    last_th, last_about_th = await asyncio.gather(
+        asyncio.to_thread(translate_to_th, word),
+        asyncio.to_thread(translate_to_th, about_en),
+    )
+    return last_th, last_about_th
+
+async def set_last_reveal(st: dict, word: str) -> None:
+    """Fill last_en/last_th/last_about_* on clear or fail."""
+    if st.get("wiki_pending"):
+        # The reveal needs the about text; wait for the summary here.
+        info = await asyncio.to_thread(wikipedia_summary, word)
+        st["img"] = info["img"]
+        st["desc_en"] = info["desc_en"]
+        st["extract_en"] = info["extract_en"]
+        st["wiki_pending"] = False
+    about_en = (st.get("desc_en") or st.get("extract_en") or "").strip()
+    last_th, last_about_th = await _translate_pair(word, about_en)
+    st["last_en"] = word
+    st["last_th"] = last_th or "-"
+    st["last_about_en"] = about_en or "-"
+    st["last_about_th"] = last_about_th if about_en else "-"
+
+def public_state(st: dict) -> dict:
+    word = st.get("word", "")
+    g_mask = int(st.get("g", 0))
+    # Re-render the mask only when a letter was actually revealed; /api/state
+    # polls between guesses reuse the string rendered at the last change.
+    if word and st.get("_masked") and st.get("_g_at_render") == g_mask:
+        masked = st["_masked"]
+    else:
+        masked = mask_word(word, g_mask) if word else ""
+        st["_masked"] = masked
+        st["_g_at_render"] = g_mask
+    return {
+        "stage": st.get("stage", 1),
+        "life": st.get("life", START_LIFE),
+        "length": len(word),
+        "masked": masked,
+        "wrong": mask_letters(int(st.get("w", 0))),
+        "status": st.get("status", "playing"),
+        "message": st.get("message", ""),
+
+        # show immediately
+        "img": st.get("img", ""),
+        "hint_letters_used": st.get("hint_letters_used", 0),
+        "hint_letters_max": HINT_LETTER_MAX,
+
+        # last revealed (only changes after clear/fail)
+        "last_en": st.get("last_en", ""),
+        "last_th": st.get("last_th", ""),
+        "last_about_en": st.get("last_about_en", ""),
+        "last_about_th": st.get("last_about_th", ""),
+    }
+
+def get_state():
+    st = session.get("game")
+    # Drop sessions from before the bitmask state format.
+    if st and "g" not in st:
+        return None
+    # Snapshot what was loaded so save_state can skip no-op writes.
+    # (flask.g spelled out: plain `g` is the guessed letter in api_guess.)
+    flask.g._game_snapshot = orjson.dumps(st) if st else None
+    return st
+
+def save_state(st):
+    # Each session write is a Redis round-trip; skip it when the state is
+    # byte-identical to what get_state loaded (e.g. repeated "Already
+    # guessed" replies under noisy clients).
+    if orjson.dumps(st) == getattr(flask.g, "_game_snapshot", None):
+        return
+    session["game"] = st
+
+# ----------------- routes -----------------
+@app.get("/")
+def index():
+    return render_template("index.html")
+
+@app.get("/api/state")
+def api_state():
+    st = get_state()
+    if not st:
+        return jsonify({"status": "no_game"})
+    if st.get("wiki_pending"):
+        _backfill_wiki(st)
+        if not st.get("wiki_pending"):
+            save_state(st)
+    # Weak ETag over everything public_state derives its output from, so
+    # idle polls revalidate to an empty 304 instead of re-sending the body.
+    # crc32 (not hash()) so the tag is stable across workers and restarts.
+    # The word is part of the digest (hashed, never sent) so a new round
+    # with the same stage/life/masks can't revalidate against the old one.
+    etag = 'W/"%x"' % zlib.crc32(orjson.dumps([
+        st.get("word"), st.get("stage"), st.get("life"),
+        st.get("g", 0), st.get("w", 0),
+        st.get("status"), st.get("message"), st.get("hint_letters_used"),
+        st.get("img"),
+    ]))
+    if request.headers.get("If-None-Match") == etag:
+        return "", 304
+    resp = jsonify(public_state(st))
+    resp.headers["ETag"] = etag
+    return resp
+
+@app.post("/api/reset")
+def api_reset():
+    session.pop("game", None)
+    return jsonify({"ok": True})
+
+@app.post("/api/start")
+def api_start():
+    st = start_round(stage=1, life=START_LIFE)
+    save_state(st)
+    return jsonify(public_state(st))
+
+@app.post("/api/guess")
+async def api_guess():
+    st = get_state()
+    if not st:
+        return jsonify({"error": "no_game"}), 400
+    # The client renders POST responses, so resolve a deferred summary here
+    # too (cheap cache probe) — not only on /api/state polls.
+    if st.get("wiki_pending"):
+        _backfill_wiki(st)
+    if st["status"] != "playing":
+        save_state(st)
+        return jsonify(public_state(st))
+
+    data = request.get_json(silent=True) or {}
+    g = (data.get("guess") or "").lower().strip()
+
+    # a-z only: isalpha() also accepts letters like "ß"/"é", whose
+    # letter_bit would overflow the 26-bit session masks.
+    if len(g) != 1 or not ("a" <= g <= "z"):
+        st["message"] = "Enter ONE letter only (a-z)"
+        save_state(st)
+        return jsonify(public_state(st))
+
+    g_mask = int(st["g"])
+    w_mask = int(st["w"])
+    word = st["word"]
+    life = int(st["life"])
+    bit = letter_bit(g)
+
+    if (g_mask | w_mask) & bit:
+        st["message"] = f"Already guessed: {g}"
+        save_state(st)
+        return jsonify(public_state(st))
+
+    if g in word:
+        g_mask |= bit
+        life += 2
+        st["message"] = f"✅ Correct! +2 life -> {life}"
+    else:
+        w_mask |= bit
+        life -= 1
+        st["message"] = f"❌ Wrong! -1 life -> {life}"
+
+    st["g"] = g_mask
+    st["w"] = w_mask
+    st["life"] = life
+
+    # fail
+    if life <= 0:
+        st["status"] = "failed"
+        await set_last_reveal(st, word)
+        st["message"] = f"💀 GAME OVER! Word: {st['last_en']} | ไทย: {st['last_th']}"
+        save_state(st)
+        return jsonify(public_state(st))
+
+    # clear -> next round immediately
+    if (g_mask & WORD_MASK[word]) == WORD_MASK[word]:
+        await set_last_reveal(st, word)
+
+        next_stage = int(st["stage"]) + 1
+        next_life = life  # carry life
+        nxt = start_round(stage=next_stage, life=next_life)
+
+        # carry last reveal info into new round
+        nxt["last_en"] = st["last_en"]
+        nxt["last_th"] = st["last_th"]
+        nxt["last_about_en"] = st["last_about_en"]
+        nxt["last_about_th"] = st["last_about_th"]
+        nxt["message"] = f"🎉 CLEAR! {nxt['last_en']} | ไทย: {nxt['last_th']} → Next word!"
+
+        st = nxt
+
+    save_state(st)
+    return jsonify(public_state(st))
+
+@app.post("/api/hint_letter")
+async def api_hint_letter():
+    st = get_state()
+    if not st:
+        return jsonify({"error": "no_game"}), 400
+    if st.get("wiki_pending"):
+        _backfill_wiki(st)
+    if st["status"] != "playing":
+        save_state(st)
+        return jsonify(public_state(st))
+
+    used = int(st.get("hint_letters_used", 0))
+    if used >= HINT_LETTER_MAX:
+        st["message"] = "Hint letter limit reached (2 per word)."
+        save_state(st)
+        return jsonify(public_state(st))
+
+    word = st["word"]
+    g_mask = int(st["g"])
+    remaining = mask_letters(WORD_MASK[word] & ~g_mask)
+
+    if not remaining:
+        st["message"] = "No letters left to reveal."
+        save_state(st)
+        return jsonify(public_state(st))
+
+    # Weight by corpus letter frequency so the 2-life hint tends to reveal
+    # a common (high-information) letter rather than a rare one.
+    reveal = random.choices(remaining, weights=[LETTER_FREQ[c] for c in remaining])[0]
+    g_mask |= letter_bit(reveal)
+    st["g"] = g_mask
+
+    st["hint_letters_used"] = used + 1
+    st["life"] = int(st["life"]) - HINT_LETTER_COST
+    st["message"] = f"💡 Hint: '{reveal}' (-{HINT_LETTER_COST} life) | {st['hint_letters_used']}/{HINT_LETTER_MAX}"
+
+    # fail after hint
+    if st["life"] <= 0:
+        st["status"] = "failed"
+        await set_last_reveal(st, word)
+        st["message"] = f"💀 GAME OVER! Word: {st['last_en']} | ไทย: {st['last_th']}"
+        save_state(st)
+        return jsonify(public_state(st))
+
+    # clear after hint -> next round
+    if (g_mask & WORD_MASK[word]) == WORD_MASK[word]:
+        await set_last_reveal(st, word)
+
+        next_stage = int(st["stage"]) + 1
+        nxt = start_round(stage=next_stage, life=int(st["life"]))
+
+        nxt["last_en"] = st["last_en"]
+        nxt["last_th"] = st["last_th"]
+        nxt["last_about_en"] = st["last_about_en"]
+        nxt["last_about_th"] = st["last_about_th"]
+        nxt["message"] = f"🎉 CLEAR! {nxt['last_en']} | ไทย: {nxt['last_th']} → Next word!"
+
+        st = nxt
+
+    save_state(st)
+    return jsonify(public_state(st))
+
+if __name__ == "__main__":
+    # Local dev only — production runs `gunicorn app:app` (gunicorn.conf.py).
+    app.run(debug=True)
@@ -0,0 +1,46 @@
+"""Offline pre-resolver for the animal wordlist.
+
+Fetches the Wikipedia summary and Thai translation for every word in
+animals.txt and writes them to animals_wiki.json / animals_th.json next
+to app.py, which loads them at startup. Run at build/deploy time (needs
+outbound network):
+
+    python build_preload.py
+
+Only genuine 404s are stored as empty wiki entries — the app treats
+those as a permanent known-miss set. Transient failures (timeouts,
+5xx, network blips) are skipped, not written, so they can't get frozen
+into the preload; re-run the script to fill the gaps.
+"""
+from pathlib import Path
+
+import orjson
+
+from app import ANIMALS, _fetch_translation, _wiki_summary_from_api
+
+def main() -> None:
+    wiki: dict[str, dict] = {}
+    th: dict[str, str] = {}
+    skipped = 0
+    for w in ANIMALS:
+        try:
+            wiki[w] = _wiki_summary_from_api(w)
+            wiki_status = "ok" if any(wiki[w].values()) else "empty"
+        except LookupError:
+            # Permanent "no such page" — record it so the app never re-fetches.
+            wiki[w] = {"img": "", "desc_en": "", "extract_en": ""}
+            wiki_status = "404"
+        except Exception as exc:
+            # Transient failure: leave the word out of the preload entirely.
+            skipped += 1
+            wiki_status = f"SKIP ({type(exc).__name__})"
+        th[w] = _fetch_translation(w)
+        print(f"{w}: wiki={wiki_status} th={'ok' if th[w] else 'MISS'}")
+
+    Path("animals_wiki.json").write_bytes(orjson.dumps(wiki, option=orjson.OPT_INDENT_2))
+    Path("animals_th.json").write_bytes(orjson.dumps(th, option=orjson.OPT_INDENT_2))
+    print(f"wrote {len(wiki)} wiki entries, {len(th)} translations, "
+          f"skipped {skipped} transient failures")
+
+if __name__ == "__main__":
+    main()
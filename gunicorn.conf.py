@@ -0,0 +1,12 @@
+"""Gunicorn config: run with `gunicorn app:app`.
+
+The workload is I/O-bound (translate/wiki HTTP), so a few processes with
+many threads let slow upstream calls overlap instead of blocking every
+user the way the single-threaded debug server does. Game state and the
+lookup cache live in Redis, so workers share them freely.
+"""
+bind = "0.0.0.0:8000"
+worker_class = "gthread"
+workers = 2
+threads = 32
+timeout = 15